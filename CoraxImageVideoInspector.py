@@ -1,32 +1,56 @@
 
 from qgis.PyQt.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QLabel, QScrollArea,
                                  QFormLayout, QLineEdit, QPushButton, QHBoxLayout, QComboBox,
-                                 QAction, QMessageBox, QGroupBox)
+                                 QAction, QMessageBox, QGroupBox, QProgressBar)
 from qgis.PyQt.QtCore import Qt, QUrl, QTimer
 from qgis.PyQt.QtGui import QPixmap, QKeySequence, QShortcut, QDesktopServices, QIcon
-from qgis.core import QgsProject
+from qgis.core import QgsApplication, QgsProject, QgsTask, QgsVectorLayerFeatureSource
 import os
 
+class FeatureLoadTask(QgsTask):
+    """Fetch all features of a layer off the main thread."""
+    def __init__(self, layer, on_finished):
+        super().__init__(f"Loading {layer.name()}", QgsTask.CanCancel)
+        # The feature source is a snapshot that is safe to iterate from the worker thread
+        self.source = QgsVectorLayerFeatureSource(layer)
+        self.total = layer.featureCount()
+        self.on_finished = on_finished
+        self.features = []
+        self.exception = None
+
+    def run(self):
+        try:
+            for i, feature in enumerate(self.source.getFeatures()):
+                if self.isCanceled():
+                    return False
+                self.features.append(feature)
+                if self.total > 0 and i % 100 == 0:
+                    self.setProgress(100.0 * i / self.total)
+        except Exception as e:
+            self.exception = e
+            return False
+        return True
+
+    def finished(self, result):
+        self.on_finished(self, result)
+
 class ImageVideoInspectorDock(QDockWidget):
     def __init__(self):
         super().__init__("Image/Video Inspector")
         self.layer = None
+        self.layer_id = None
         self.features = []
         self.current_index = 0
         self.current_scale = 1.0
         self.slideshow_timer = QTimer()
         self.slideshow_timer.timeout.connect(self.next_record)
 
-        # Lookup for species and shortcodes
-        self.species_map = {}
-        lut_layers = QgsProject.instance().mapLayersByName("bird_pest_lut")
-        if lut_layers:
-            lut_layer = lut_layers[0]
-            fields = [f.name() for f in lut_layer.fields()]
-            species_field = "species" if "species" in fields else fields[0]
-            shortcode_field = "shortcode" if "shortcode" in fields else fields[-1]
-            for feat in lut_layer.getFeatures():
-                self.species_map[str(feat[species_field])] = str(feat[shortcode_field])
+        # Lookup for species and shortcodes, built on first use
+        self._species_map = None
+        self.lut_layer_id = None
+        # Layer list is filled when the dock is shown and after project layer changes
+        self.layers_stale = True
+        self.load_task = None
 
         # Main widget
         main_widget = QWidget()
@@ -34,16 +58,15 @@ class ImageVideoInspectorDock(QDockWidget):
 
         # Layer selector
         self.layer_selector = QComboBox()
-        point_layers = [layer.name() for layer in QgsProject.instance().mapLayers().values()
-                        if layer.type() == layer.VectorLayer and layer.geometryType() == 0]
-        if point_layers:
-            self.layer_selector.addItems(point_layers)
-        else:
-            self.layer_selector.addItem("No point layers available")
-            self.layer_selector.setEnabled(False)
         self.layer_selector.currentIndexChanged.connect(self.load_layer)
         main_layout.addWidget(self.layer_selector)
 
+        # Progress bar for background layer loading
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.hide()
+        main_layout.addWidget(self.progress_bar)
+
         # Viewer area
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
@@ -151,12 +174,7 @@ class ImageVideoInspectorDock(QDockWidget):
         main_layout.addWidget(self.fields_container)
 
         # Disable navigation until layer is loaded
-        self.prev_btn.setEnabled(False)
-        self.next_btn.setEnabled(False)
-        self.save_btn.setEnabled(False)
-        self.first_btn.setEnabled(False)
-        self.last_btn.setEnabled(False)
-        self.jump_btn.setEnabled(False)
+        self.set_controls_enabled(False)
 
         self.setWidget(main_widget)
 
@@ -177,30 +195,180 @@ class ImageVideoInspectorDock(QDockWidget):
         QShortcut(QKeySequence(Qt.Key_Right), self, self.next_record)
         QShortcut(QKeySequence("Ctrl+S"), self, self.save_changes)
 
-        # Auto-load first layer if available
+        # Keep layer list and LUT in step with the project
+        project = QgsProject.instance()
+        project.layersAdded.connect(self.on_layers_added)
+        project.layersRemoved.connect(self.on_layers_removed)
+
+    @property
+    def species_map(self):
+        if self._species_map is None:
+            self._species_map = {}
+            lut_layers = QgsProject.instance().mapLayersByName("bird_pest_lut")
+            if lut_layers:
+                lut_layer = lut_layers[0]
+                self.lut_layer_id = lut_layer.id()
+                fields = [f.name() for f in lut_layer.fields()]
+                species_field = "species" if "species" in fields else fields[0]
+                shortcode_field = "shortcode" if "shortcode" in fields else fields[-1]
+                for feat in lut_layer.getFeatures():
+                    self._species_map[str(feat[species_field])] = str(feat[shortcode_field])
+        return self._species_map
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.layers_stale:
+            self.refresh_layer_list()
+
+    def on_layers_added(self, layers):
+        if any(layer.name() == "bird_pest_lut" for layer in layers):
+            self.refresh_species()
+        self.on_project_layers_changed()
+
+    def on_layers_removed(self, layer_ids):
+        # Removed layers are already deleted here, so match on the stored ids
+        if self.layer_id in layer_ids:
+            self.cancel_loading()
+            self.reset_records()
+            self.status_label.setText("No records loaded")
+        if self.lut_layer_id in layer_ids:
+            self.refresh_species()
+        self.on_project_layers_changed()
+
+    def on_project_layers_changed(self):
+        if self.isVisible():
+            self.refresh_layer_list()
+        else:
+            self.layers_stale = True
+
+    def refresh_species(self):
+        self._species_map = None
+        self.lut_layer_id = None
+        if "species" not in self.field_edits:
+            return
+        species = [str(k) for k in self.species_map.keys()]
+        for dropdown in (self.species_dropdown, self.species_second_dropdown):
+            current = dropdown.currentText()
+            dropdown.blockSignals(True)
+            dropdown.clear()
+            dropdown.addItem("")
+            dropdown.addItems(species)
+            # Keep the record's value even if the new LUT no longer lists it
+            if current and current not in species:
+                dropdown.addItem(current)
+            dropdown.setCurrentText(current)
+            dropdown.blockSignals(False)
+        self.update_shortcodes()
+
+    def refresh_layer_list(self):
+        self.layers_stale = False
+        current = self.layer_selector.currentText() if self.layer_selector.isEnabled() else None
+        point_layers = [layer.name() for layer in QgsProject.instance().mapLayers().values()
+                        if layer.type() == layer.VectorLayer and layer.geometryType() == 0]
+
+        self.layer_selector.blockSignals(True)
+        self.layer_selector.clear()
         if point_layers:
+            self.layer_selector.addItems(point_layers)
+            self.layer_selector.setEnabled(True)
+            if current in point_layers:
+                self.layer_selector.setCurrentText(current)
+        else:
+            self.layer_selector.addItem("No point layers available")
+            self.layer_selector.setEnabled(False)
+        self.layer_selector.blockSignals(False)
+
+        if not point_layers:
+            self.cancel_loading()
+            self.reset_records()
+            self.status_label.setText("No records loaded")
+        elif current not in point_layers or self.layer is None:
+            # Auto-load first layer if the previous selection is gone
             self.load_layer()
 
+    def cancel_loading(self):
+        if self.load_task is not None:
+            self.load_task.progressChanged.disconnect(self.on_load_progress)
+            self.load_task.cancel()
+            self.load_task = None
+        self.progress_bar.hide()
+
+    def on_load_progress(self, value):
+        if self.sender() is self.load_task:
+            self.progress_bar.setValue(int(value))
+
+    def set_controls_enabled(self, enabled):
+        self.prev_btn.setEnabled(enabled)
+        self.next_btn.setEnabled(enabled)
+        self.save_btn.setEnabled(enabled)
+        self.first_btn.setEnabled(enabled)
+        self.last_btn.setEnabled(enabled)
+        self.jump_btn.setEnabled(enabled)
+        self.clear_btn.setEnabled(enabled)
+        self.popout_btn.setEnabled(enabled)
+        self.zoom_in_btn.setEnabled(enabled)
+        self.zoom_out_btn.setEnabled(enabled)
+        self.fit_btn.setEnabled(enabled)
+        self.slideshow_btn.setEnabled(enabled)
+
+    def reset_records(self):
+        self.slideshow_timer.stop()
+        self.slideshow_btn.setText("Start Slideshow")
+        self.layer = None
+        self.layer_id = None
+        self.features = []
+        self.current_index = 0
+        self.set_controls_enabled(False)
+
+        # Clear the previous record from the viewer and form
+        self.image_label.clear()
+        self.play_video_btn.hide()
+        for i in reversed(range(self.form_layout.count())):
+            self.form_layout.removeRow(i)
+        self.field_edits.clear()
+
     def load_layer(self):
+        self.cancel_loading()
+        self.reset_records()
+
         layer_name = self.layer_selector.currentText()
         layers = QgsProject.instance().mapLayersByName(layer_name)
         if not layers:
             self.status_label.setText(f"Layer '{layer_name}' not found")
             return
 
-        self.layer = layers[0]
-        if self.layer.type() != self.layer.VectorLayer or self.layer.geometryType() != 0:
+        layer = layers[0]
+        if layer.type() != layer.VectorLayer or layer.geometryType() != 0:
             self.status_label.setText("Invalid layer type")
             return
 
-        self.features = list(self.layer.getFeatures())
-        print(f"DEBUG: Loading layer '{layer_name}' with {len(self.features)} features")
+        self.layer = layer
+        self.layer_id = layer.id()
+        self.status_label.setText(f"Loading '{layer_name}'...")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.load_task = FeatureLoadTask(layer, self.on_features_loaded)
+        self.load_task.progressChanged.connect(self.on_load_progress)
+        QgsApplication.taskManager().addTask(self.load_task)
+
+    def on_features_loaded(self, task, result):
+        if task is not self.load_task:
+            # Superseded by a later layer selection
+            return
+        self.load_task = None
+        self.progress_bar.hide()
+        if not result:
+            # Forget the layer so the next refresh or show reloads it
+            self.reset_records()
+            if task.exception is not None:
+                self.status_label.setText(f"Loading failed: {task.exception}")
+            else:
+                self.status_label.setText("Loading cancelled")
+            return
 
-        # Build form fields
-        for i in reversed(range(self.form_layout.count())):
-            self.form_layout.removeRow(i)
-        self.field_edits.clear()
+        self.features = task.features
 
+        # Build form fields
         self.species_dropdown = QComboBox()
         self.species_dropdown.addItem("")
         self.species_dropdown.addItems([str(k) for k in self.species_map.keys()])
@@ -242,17 +410,14 @@ class ImageVideoInspectorDock(QDockWidget):
         self.field_edits["fid"] = fid_edit
 
         if self.features:
-            self.prev_btn.setEnabled(True)
-            self.next_btn.setEnabled(True)
-            self.save_btn.setEnabled(True)
-            self.first_btn.setEnabled(True)
-            self.last_btn.setEnabled(True)
-            self.jump_btn.setEnabled(True)
+            self.set_controls_enabled(True)
             self.load_record()
         else:
             self.status_label.setText("No records found")
 
     def load_record(self):
+        if not self.features:
+            return
         feature = self.features[self.current_index]
         media_path = feature["media_path"] if "media_path" in feature.fields().names() else None
 
@@ -322,12 +487,16 @@ class ImageVideoInspectorDock(QDockWidget):
         self.load_record()
 
     def play_video(self):
+        if not self.features:
+            return
         feature = self.features[self.current_index]
         media_path = feature["media_path"]
         if os.path.exists(media_path):
             QDesktopServices.openUrl(QUrl.fromLocalFile(media_path))
 
     def show_fullscreen_image(self):
+        if not self.features:
+            return
         feature = self.features[self.current_index]
         media_path = feature["media_path"]
         if os.path.exists(media_path) and media_path.lower().endswith((".jpg", ".jpeg", ".png")):
@@ -343,6 +512,8 @@ class ImageVideoInspectorDock(QDockWidget):
             dlg.show()
 
     def save_changes(self):
+        if not self.features:
+            return
         feature = self.features[self.current_index]
         self.layer.startEditing()
         feature["species"] = self.species_dropdown.currentText() if self.species_dropdown.currentText() else None
@@ -391,6 +562,13 @@ class ImageVideoInspectorDock(QDockWidget):
         QMessageBox.information(self, "About Corax Image/Video Inspector",
                                 "Version 3.1\nAuthor: Kim Ollivier\nHelp file included in plugin folder.\n")
 
+    def teardown(self):
+        self.cancel_loading()
+        self.slideshow_timer.stop()
+        project = QgsProject.instance()
+        project.layersAdded.disconnect(self.on_layers_added)
+        project.layersRemoved.disconnect(self.on_layers_removed)
+
 # Plugin entry point
 def classFactory(iface):
     return CoraxImageVideoInspectorPlugin(iface)
@@ -407,11 +585,12 @@ class CoraxImageVideoInspectorPlugin:
         self.action.triggered.connect(self.show_dock)
         self.iface.addToolBarIcon(self.action)
         self.iface.addPluginToMenu("&Corax Tools", self.action)
-        self.dock = ImageVideoInspectorDock()
-        self.dock.hide()
-        self.iface.addDockWidget(Qt.RightDockWidgetArea, self.dock)
 
     def show_dock(self):
+        # Build the dock on first use so QGIS start-up and project loading stay fast
+        if self.dock is None:
+            self.dock = ImageVideoInspectorDock()
+            self.iface.addDockWidget(Qt.RightDockWidgetArea, self.dock)
         self.dock.show()
 
     def unload(self):
@@ -419,4 +598,7 @@ class CoraxImageVideoInspectorPlugin:
             self.iface.removeToolBarIcon(self.action)
             self.iface.removePluginMenu("&Corax Tools", self.action)
         if self.dock:
+            self.dock.teardown()
             self.iface.removeDockWidget(self.dock)
+            self.dock.deleteLater()
+            self.dock = None
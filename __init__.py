@@ -1,4 +1,4 @@
 # version: 3.0.0
 def classFactory(iface):
-    from .CoraxImageVideoInspector import CoraxImageVideoInspector
-    return CoraxImageVideoInspector(iface)
+    from .CoraxImageVideoInspector import CoraxImageVideoInspectorPlugin
+    return CoraxImageVideoInspectorPlugin(iface)